@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+"""
+Accuracy regression harness for prayer times engines.
+
+The golden dataset holds the exact 'Float' outputs of the scalar reference
+engine (PrayTimes.compute_times) over every calculation method, every
+higher latitudes method, both asr methods, several elevations, polar and
+equatorial sites and leap days.
+
+Any alternative engine (caches, quantized coordinates, batch engines...) can
+be checked against it: the report gives the max / percentile error in minutes
+together with the engine throughput.
+
+* Generate the golden dataset
+>> python -m prayertimes.accuracy generate tests/data/golden_times.jsonl
+
+* Check the reference engine against it
+>> python -m prayertimes.accuracy check tests/data/golden_times.jsonl
+
+* Check another engine
+>> report = evaluate(my_engine, load_golden('tests/data/golden_times.jsonl'))
+>> print(report)
+
+An engine is a callable taking a case (see make_cases) and returning a dict
+of times (float hours, or '-----' when the time does not exist).
+"""
+
+import argparse
+import datetime
+import itertools
+import json
+import math
+import time
+
+from prayertimes.prayertimes import PrayTimes
+
+
+# Reference sites: (coords, utc_offset)
+SITES = {
+    'paris': ((48.8566, 2.3522, 35), 1),
+    'mecca': ((21.3891, 39.8579, 277), 3),
+    'quito': ((-0.1807, -78.4678, 2850), -5),
+    'singapore': ((1.3521, 103.8198, 15), 8),
+    'reykjavik': ((64.1466, -21.9426, 0), 0),
+    'tromso': ((69.6492, 18.9553, 10), 1),
+    'longyearbyen': ((78.2232, 15.6267, 0), 1),
+    'ushuaia': ((-54.8019, -68.3030, 20), -3),
+}
+
+# Equinox, both solstices and leap days (2000 is a leap century)
+DATES = [(2023, 3, 20), (2023, 6, 21), (2023, 12, 21), (2024, 2, 29), (2000, 2, 29)]
+
+HIGH_LATS_METHODS = ['None', 'NightMiddle', 'OneSeventh', 'AngleBased']
+
+ASR_METHODS = ['Standard', 'Hanafi']
+
+# Methods swept over every highLats / asr combination
+SWEEP_METHODS = ['MWL', 'Jafari']
+
+NAN_TIME = '-----'
+
+
+def make_cases():
+    """
+    Build the list of golden cases (without expected times).
+    Every method is run on every site and date with its default settings,
+    then SWEEP_METHODS are run on every highLats / asr combination.
+    :return:
+    """
+    cases = []
+    for method, site, date in itertools.product(PrayTimes.methods, SITES, DATES):
+        cases.append({'site': site, 'date': list(date), 'method': method, 'adjust': {}})
+
+    for method, high_lats, asr, site, date in itertools.product(SWEEP_METHODS, HIGH_LATS_METHODS, ASR_METHODS,
+                                                                 SITES, DATES):
+        cases.append({'site': site, 'date': list(date), 'method': method,
+                      'adjust': {'highLats': high_lats, 'asr': asr}})
+
+    for case in cases:
+        coords, utc_offset = SITES[case['site']]
+        case['coords'] = list(coords)
+        case['utc_offset'] = utc_offset
+    return cases
+
+
+def reference_engine(case):
+    """
+    Compute a case with the scalar reference engine.
+    :param case:
+    :return:
+    """
+    pt = PrayTimes(method=case['method'], time_format='Float')
+    pt.adjust(case['adjust'])
+    return pt.get_times(datetime.date(*case['date']), case['coords'], utc_offset=case['utc_offset'])
+
+
+def generate_golden(path, engine=reference_engine):
+    """
+    Write the golden dataset (one JSON case per line).
+    :param path:
+    :param engine:
+    :return:
+    """
+    cases = make_cases()
+    with open(path, 'w') as f:
+        for case in cases:
+            case['times'] = engine(case)
+            f.write(json.dumps(case, separators=(',', ':')) + '\n')
+    return cases
+
+
+def load_golden(path):
+    """
+    Read the golden dataset.
+    :param path:
+    :return:
+    """
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def minute_error(expected, actual):
+    """
+    Return the error in minutes between two times (wrapped on 24 hours),
+    or None if only one of them is a valid time.
+    :param expected:
+    :param actual:
+    :return:
+    """
+    expected_nan = expected == NAN_TIME or (isinstance(expected, float) and math.isnan(expected))
+    actual_nan = actual == NAN_TIME or (isinstance(actual, float) and math.isnan(actual))
+    if expected_nan or actual_nan:
+        return 0.0 if expected_nan and actual_nan else None
+    diff = abs(actual - expected) % 24.0
+    return min(diff, 24.0 - diff) * 60.0
+
+
+class AccuracyReport(object):
+    """
+    Result of an engine evaluation against the golden dataset.
+    """
+
+    def __init__(self, errors, mismatches, cases, elapsed):
+        self.errors = errors
+        self.mismatches = mismatches
+        self.cases = cases
+        self.elapsed = elapsed
+
+    @property
+    def max_error(self):
+        return max(self.errors) if self.errors else 0.0
+
+    @property
+    def throughput(self):
+        return self.cases / self.elapsed if self.elapsed > 0 else float('inf')
+
+    def percentile(self, pct):
+        return PrayTimes.percentile(self.errors, pct)
+
+    def __str__(self) -> str:
+        lines = [
+            f"Cases      : {self.cases}",
+            f"Times      : {len(self.errors) + len(self.mismatches)}",
+            f"Mismatches : {len(self.mismatches)} (time exists in only one engine)",
+            f"Max error  : {self.max_error:.6f} min",
+            f"p50 / p95 / p99 : {self.percentile(50):.6f} / {self.percentile(95):.6f} / "
+            f"{self.percentile(99):.6f} min",
+            f"Throughput : {self.throughput:.1f} cases/s",
+        ]
+        return '\n'.join(lines)
+
+
+def evaluate(engine, cases, batch=False):
+    """
+    Run an engine on the golden cases and compare with the expected times.
+    :param engine: callable(case) -> times, or callable(cases) -> list of times if batch is True
+    :param cases: golden cases (see load_golden)
+    :param batch:
+    :return: AccuracyReport
+    """
+    start = time.perf_counter()
+    if batch:
+        results = list(engine(cases))
+    else:
+        results = [engine(case) for case in cases]
+    elapsed = time.perf_counter() - start
+
+    errors = []
+    mismatches = []
+    for case, result in zip(cases, results):
+        for name, expected in case['times'].items():
+            error = minute_error(expected, result[name])
+            if error is None:
+                mismatches.append((case['site'], tuple(case['date']), case['method'], name))
+            else:
+                errors.append(error)
+    return AccuracyReport(errors, mismatches, len(cases), elapsed)
+
+
+def main():
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description="Prayer times accuracy harness")
+    parser.add_argument('action', choices=['generate', 'check'])
+    parser.add_argument('path', help="golden dataset path")
+    args = parser.parse_args()
+
+    if args.action == 'generate':
+        cases = generate_golden(args.path)
+        print(f"{len(cases)} cases written to {args.path}")
+    else:
+        print(evaluate(reference_engine, load_golden(args.path)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+"""
+Asyncio front end for the prayer times calculator.
+
+Concurrent get_times calls are gathered during a short window (or until
+max_batch calls are pending), identical requests are deduplicated, and the
+batch is computed at once in an executor (default thread pool, or any
+concurrent.futures executor such as a ProcessPoolExecutor), so the event
+loop is never blocked by the computation.
+
+* Sample usage
+>> apt = AsyncPrayTimes(method='ISNA', window=0.002, max_batch=64)
+>> times = await apt.get_times(datetime.date(2011, 2, 9), (43, -80), utc_offset=-5)
+>> apt.stats()
+"""
+
+import asyncio
+import collections
+import time
+
+from prayertimes.prayertimes import PrayTimes
+
+
+def compute_batch(requests):
+    """
+    Compute a batch of requests, one calculator per distinct configuration.
+    Module level function so that it can run in a process pool.
+    :param requests: list of (date, coords, kwargs, method, settings, offset, time_format)
+    :return: list of times, or of the exception raised for the request
+    """
+    calculators = {}
+    results = []
+    for date, coords, kwargs, method, settings, offset, time_format in requests:
+        config = (method, settings, offset, time_format)
+        if config not in calculators:
+            pt = PrayTimes(method=method, time_format=time_format)
+            pt.adjust(dict(settings))
+            pt.tune(dict(offset))
+            calculators[config] = pt
+        try:
+            results.append(calculators[config].get_times(date, coords, **dict(kwargs)))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+class AsyncPrayTimes(object):
+    """
+    AsyncPrayTimes class
+
+    Awaitable facade of PrayTimes coalescing concurrent get_times calls in batches.
+    Settings are set with the same API as PrayTimes (set_method, adjust, tune, time_format)
+    and captured when get_times is called.
+    """
+
+    def __init__(self, window=0.002, max_batch=64, executor=None, latency_samples=10000, **kwargs):
+        """
+        Initialize the asyncio front end.
+
+        Args:
+            window: maximum time (seconds) a call waits for other calls before its batch is dispatched
+            max_batch: number of pending calls dispatching the batch immediately
+            executor: concurrent.futures executor running the batches (default: loop default executor)
+            latency_samples: number of latency samples kept for the statistics
+            kwargs: PrayTimes options (method, time_format)
+        """
+        self.window = window
+        self.max_batch = max_batch
+        self.executor = executor
+        self.calculator = PrayTimes(**kwargs)
+
+        self._queue = []
+        self._flush_handle = None
+
+        self.batch_sizes = collections.Counter()  # calls per batch
+        self.unique_sizes = collections.Counter()  # requests per batch, after deduplication
+        self.requests = 0
+        self.deduplicated = 0
+        self.added_latency = collections.deque(maxlen=latency_samples)
+        self.queue_latency = collections.deque(maxlen=latency_samples)
+
+    @property
+    def time_format(self):
+        return self.calculator.time_format
+
+    @time_format.setter
+    def time_format(self, time_format):
+        self.calculator.time_format = time_format
+
+    def set_method(self, method):
+        self.calculator.set_method(method)
+
+    def adjust(self, params):
+        self.calculator.adjust(params)
+
+    def tune(self, time_offsets):
+        self.calculator.tune(time_offsets)
+
+    @property
+    def queue_depth(self):
+        return len(self._queue)
+
+    def get_times(self, date, coords, **kwargs):
+        """
+        Return an awaitable of the prayer times for a given date (see PrayTimes.get_times).
+        The current settings are captured at call time.
+        :param date:
+        :param coords:
+        :param kwargs: utc_offset or timezone
+        :return:
+        """
+        pt = self.calculator
+        request = (date, tuple(coords), tuple(sorted(kwargs.items())), pt.method,
+                   tuple(sorted(pt.settings.items())), tuple(sorted(pt.offset.items())), pt.time_format)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append((request, future, time.perf_counter()))
+        self.requests += 1
+
+        if len(self._queue) >= self.max_batch:
+            self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self.flush)
+
+        return future
+
+    def flush(self):
+        """
+        Dispatch the pending calls now.
+        If the batch cannot be dispatched, every pending call fails with the error.
+        :return:
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._queue:
+            return
+
+        queue, self._queue = self._queue, []
+        now = time.perf_counter()
+
+        try:
+            # deduplicate identical requests
+            waiters = {}
+            for request, future, queued_at in queue:
+                waiters.setdefault(request, []).append((future, queued_at))
+            requests = list(waiters)
+
+            loop = asyncio.get_running_loop()
+            batch = loop.run_in_executor(self.executor, compute_batch, requests)
+        except Exception as e:
+            for _, future, _ in queue:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.queue_latency.extend(now - queued_at for _, _, queued_at in queue)
+        self.batch_sizes[len(queue)] += 1
+        self.unique_sizes[len(requests)] += 1
+        self.deduplicated += len(queue) - len(requests)
+        batch.add_done_callback(lambda done: self._resolve(done, requests, waiters))
+
+    def _resolve(self, done, requests, waiters):
+        """
+        Resolve the futures waiting for a computed batch.
+        :param done:
+        :param requests:
+        :param waiters:
+        :return:
+        """
+        if done.cancelled():
+            results = [None] * len(requests)
+        elif done.exception() is not None:
+            results = [done.exception()] * len(requests)
+        else:
+            results = done.result()
+
+        now = time.perf_counter()
+        for request, result in zip(requests, results):
+            for future, queued_at in waiters[request]:
+                self.added_latency.append(now - queued_at)
+                if future.done():
+                    continue
+                if done.cancelled():
+                    future.cancel()
+                elif isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(dict(result))
+
+    def stats(self):
+        """
+        Return the batching statistics: queue depth, histograms of calls per batch (batch_sizes)
+        and of unique requests per batch after deduplication (unique_sizes), added latency
+        (seconds from the call to its result, executor and batch computation included)
+        and queue latency (seconds from the call to the batch dispatch).
+        :return:
+        """
+        latency = list(self.added_latency)
+        queue_latency = list(self.queue_latency)
+        return {
+            'queue_depth': self.queue_depth,
+            'requests': self.requests,
+            'deduplicated': self.deduplicated,
+            'batches': sum(self.batch_sizes.values()),
+            'batch_sizes': dict(sorted(self.batch_sizes.items())),
+            'unique_sizes': dict(sorted(self.unique_sizes.items())),
+            'added_latency': {
+                'p50': PrayTimes.percentile(latency, 50),
+                'p99': PrayTimes.percentile(latency, 99),
+                'max': max(latency) if latency else float('nan'),
+            },
+            'queue_latency': {
+                'p50': PrayTimes.percentile(queue_latency, 50),
+                'p99': PrayTimes.percentile(queue_latency, 99),
+                'max': max(queue_latency) if queue_latency else float('nan'),
+            },
+        }
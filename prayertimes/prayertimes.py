@@ -44,6 +44,8 @@ Compatible with Python 2.x and 3.x
 * set_method (method)      -- Set calculation method
 * adjust (parameters)      -- Adjust calculation parameters
 * tune (offsets)           -- Tune times by given offsets
+* render_times ([times])  -- Re-apply offsets and format without recomputing
+* sweep_grid (lat_range, lng_range, resolution, date) -- Prayer times over a lat/lng grid
 
 | Format | Description                   | Example |
 |--------|-------------------------------|---------|
@@ -189,6 +191,19 @@ class PrayTimes(object):
         }
     }
 
+    # Initial times (hours) of the main iteration
+    initial_times = {'imsak': 5, 'fajr': 5, 'sunrise': 6, 'dhuhr': 12,
+                     'asr': 13, 'sunset': 18, 'maghrib': 18, 'isha': 18}
+
+    # Inputs (attributes, settings) each computation stage depends on, in computation order.
+    # A stage is recomputed only when one of its inputs or of a previous stage inputs changed,
+    # tune offsets and time format are applied afterwards (see render_times).
+    stage_dependencies = {
+        'positions': (('julian_date',), ()),
+        'astronomical': (('lat', 'elv'), ('imsak', 'fajr', 'asr', 'maghrib', 'isha')),
+        'adjusted': (('utc_offset', 'lng'), ('imsak', 'fajr', 'maghrib', 'isha', 'dhuhr', 'midnight', 'highLats')),
+    }
+
     # Default Parameters added in Calculation Methods <METHODS> if not already there
     method_defaults = {
         'maghrib': '0 min', 'midnight': 'Standard'
@@ -210,7 +225,7 @@ class PrayTimes(object):
 
         Args:
             method: Calculation method (e.g., 'MWL', 'ISNA')
-            kwargs: Additional options (coords, timezone, date)
+            kwargs: Additional options (coords, timezone, date, time_format, get_times_hook)
         """
 
         coords = kwargs.get("coords", (0, 0, 0))
@@ -237,9 +252,17 @@ class PrayTimes(object):
 
         self.time_format = kwargs.get("time_format", "24h")
 
+        # Optional hook called with (calculator, date, coords, kwargs) after each successful get_times call
+        self.get_times_hook = kwargs.get("get_times_hook")
+
         # Initialize last calculated times storage
         self._last_calculated_times = None
 
+        # Stored computation stages: {stage: (inputs, result)}
+        self._stages = {}
+        # Number of times each stage result was reused instead of recomputed
+        self.stage_hits = {stage: 0 for stage in self.stage_dependencies}
+
     def set_method(self, method):
         """
         Set the calculation method.
@@ -282,6 +305,8 @@ class PrayTimes(object):
         :param coords:
         :return:
         """
+        call_date = date
+
         self.lat = coords[0]
         self.lng = coords[1]
         self.elv = coords[2] if len(coords) > 2 else 0
@@ -298,9 +323,12 @@ class PrayTimes(object):
             raise TypeError("UTC offset or Timezone must be specified")
 
         # Calculate and store times
-        self._last_calculated_times = self.compute_times()
+        times = self.compute_times()
 
-        return self._last_calculated_times
+        # only successful calls reach the hook
+        if self.get_times_hook is not None:
+            self.get_times_hook(self, call_date, coords, kwargs)
+        return times
 
     def get_formatted_time(self, time_, format_, suffixes=None):
         """
@@ -344,14 +372,41 @@ class PrayTimes(object):
         :param direction:
         :return:
         """
-        try:
-            decl = self.sun_position(self.julian_date + time_)[0]
-            noon = self.mid_day(time_)
-            t = 1 / 15.0 * self.arccos((-self.sin(angle) - self.sin(decl) * self.sin(self.lat)) /
-                                       (self.cos(decl) * self.cos(self.lat)))
-            return noon + (-t if direction == 'ccw' else t)
-        except ValueError:
+        return self.position_angle_time(angle, self.sun_position(self.julian_date + time_), direction)
+
+    def position_angle_time(self, angle, position, direction=None):
+        """
+        Compute the time at which sun reaches a specific angle below horizon,
+        from an already computed sun position (declination, equation of time).
+        Return NaN, without raising, when the sun never reaches the angle (high latitudes).
+        :param angle:
+        :param position:
+        :param direction:
+        :return:
+        """
+        decl, eqt = position
+        return self.hour_angle_time(self.sin(angle), self.sin(decl), self.cos(decl), self.fixhour(12 - eqt),
+                                    self.sin(self.lat), self.cos(self.lat), direction == 'ccw')
+
+    @staticmethod
+    def hour_angle_time(sin_angle, sin_decl, cos_decl, noon, sin_lat, cos_lat, ccw=False):
+        """
+        Compute the time at which sun reaches an angle from the sines / cosines of the angle,
+        the sun declination and the latitude. Return NaN when the sun never reaches the angle.
+        :param sin_angle:
+        :param sin_decl:
+        :param cos_decl:
+        :param noon:
+        :param sin_lat:
+        :param cos_lat:
+        :param ccw:
+        :return:
+        """
+        cos_t = (-sin_angle - sin_decl * sin_lat) / (cos_decl * cos_lat)
+        if not -1 <= cos_t <= 1:
             return float('nan')
+        t = 1 / 15.0 * math.degrees(math.acos(cos_t))
+        return noon + (-t if ccw else t)
 
     def asr_time(self, factor, time_):
         """
@@ -360,9 +415,26 @@ class PrayTimes(object):
         :param time_:
         :return:
         """
-        decl = self.sun_position(self.julian_date + time_)[0]
-        angle = -self.arccot(factor + self.tan(abs(self.lat - decl)))
-        return self.sun_angle_time(angle, time_)
+        return self.position_asr_time(factor, self.sun_position(self.julian_date + time_))
+
+    def position_asr_time(self, factor, position):
+        """
+        Compute asr time from an already computed sun position.
+        :param factor:
+        :param position:
+        :return:
+        """
+        return self.position_angle_time(self.asr_angle(factor, self.lat, position[0]), position)
+
+    def asr_angle(self, factor, lat, decl):
+        """
+        Compute the sun angle of asr.
+        :param factor:
+        :param lat:
+        :param decl:
+        :return:
+        """
+        return -self.arccot(factor + self.tan(abs(lat - decl)))
 
     def sun_position(self, jd):
         """
@@ -402,49 +474,255 @@ class PrayTimes(object):
         b = 2 - a + math.floor(a / 4)
         return math.floor(365.25 * (year + 4716)) + math.floor(30.6001 * (month + 1)) + day + b - 1524.5
 
-    def compute_prayertimes(self, times):
+    def sun_positions(self, times, julian_date=None):
+        """
+        Compute sun position (declination, equation of time) for each time, given as day portions.
+        Times sharing the same value share the same position.
+        :param times:
+        :param julian_date: default to the current julian date
+        :return:
+        """
+        julian_date = self.julian_date if julian_date is None else julian_date
+        positions = {}
+        for time_ in set(times.values()):
+            positions[time_] = self.sun_position(julian_date + time_)
+        return {name: positions[time_] for name, time_ in times.items()}
+
+    def compute_prayertimes(self, times, positions=None):
         """
         Compute prayer times at given julian date.
         :param times:
+        :param positions: precomputed sun positions (see sun_positions)
         :return:
         """
         times = self.day_portion(times)
-        params = self.settings
-
-        imsak = self.sun_angle_time(self.eval(params['imsak']), times['imsak'], 'ccw')
-        fajr = self.sun_angle_time(self.eval(params['fajr']), times['fajr'], 'ccw')
-        sunrise = self.sun_angle_time(self.rise_set_angle(self.elv), times['sunrise'], 'ccw')
-        dhuhr = self.mid_day(times['dhuhr'])
-        asr = self.asr_time(self.asr_factor(params['asr']), times['asr'])
-        sunset = self.sun_angle_time(self.rise_set_angle(self.elv), times['sunset'])
-        maghrib = self.sun_angle_time(self.eval(params['maghrib']), times['maghrib'])
-        isha = self.sun_angle_time(self.eval(params['isha']), times['isha'])
+        if positions is None:
+            positions = self.sun_positions(times)
+        angles = self.sun_angles(self.elv)
+
+        imsak = self.position_angle_time(angles['imsak'], positions['imsak'], 'ccw')
+        fajr = self.position_angle_time(angles['fajr'], positions['fajr'], 'ccw')
+        sunrise = self.position_angle_time(angles['sunrise'], positions['sunrise'], 'ccw')
+        dhuhr = self.fixhour(12 - positions['dhuhr'][1])
+        asr = self.position_asr_time(self.asr_factor(self.settings['asr']), positions['asr'])
+        sunset = self.position_angle_time(angles['sunset'], positions['sunset'])
+        maghrib = self.position_angle_time(angles['maghrib'], positions['maghrib'])
+        isha = self.position_angle_time(angles['isha'], positions['isha'])
 
         return {
             'imsak': imsak, 'fajr': fajr, 'sunrise': sunrise, 'dhuhr': dhuhr,
             'asr': asr, 'sunset': sunset, 'maghrib': maghrib, 'isha': isha
         }
 
-    def compute_times(self):
+    def sun_angles(self, elevation):
         """
-        Compute prayer times.
+        Return the sun angle of each time computed from a sun angle.
+        :param elevation:
         :return:
         """
-        times = {'imsak': 5, 'fajr': 5, 'sunrise': 6, 'dhuhr': 12,
-                 'asr': 13, 'sunset': 18, 'maghrib': 18, 'isha': 18}
+        params = self.settings
+        rise_set_angle = self.rise_set_angle(elevation)
+        return {'imsak': self.eval(params['imsak']), 'fajr': self.eval(params['fajr']),
+                'sunrise': rise_set_angle, 'sunset': rise_set_angle,
+                'maghrib': self.eval(params['maghrib']), 'isha': self.eval(params['isha'])}
 
+    def compute_day_times(self, positions=None):
+        """
+        Compute adjusted prayer times (including midnight), as float hours, before tuning and formatting.
+        :param positions: precomputed sun positions (see sun_positions)
+        :return:
+        """
         # main iterations
-        times = dict(self.compute_prayertimes(times))
+        times = dict(self.compute_prayertimes(dict(self.initial_times), positions))
+        return self.adjust_day_times(times)
+
+    def adjust_day_times(self, times):
+        """
+        Adjust computed prayer times and add midnight time.
+        :param times:
+        :return:
+        """
         times = dict(self.adjust_times(times))
+        times['midnight'] = self.midnight_time(times)
+        return times
 
-        # add midnight time
+    def midnight_time(self, times):
+        """
+        Compute midnight time from adjusted times.
+        :param times:
+        :return:
+        """
         if self.settings['midnight'] == 'Jafari':
-            times['midnight'] = times['sunset'] + self.time_diff(times['sunset'], times['fajr']) / 2
+            return times['sunset'] + self.time_diff(times['sunset'], times['fajr']) / 2
+        return times['sunset'] + self.time_diff(times['sunset'], times['sunrise']) / 2
+
+    def compute_times(self):
+        """
+        Compute prayer times.
+        Only the stages whose inputs changed since the last call are recomputed (see stage_dependencies).
+        :return:
+        """
+        positions = self.run_stage('positions', lambda: self.sun_positions(self.day_portion(dict(self.initial_times))))
+        times = self.run_stage('astronomical',
+                               lambda: self.compute_prayertimes(dict(self.initial_times), positions))
+        self.run_stage('adjusted', lambda: self.adjust_day_times(dict(times)))
+        return self.render_times()
+
+    def stage_key(self, stage):
+        """
+        Return the values of every input the given stage depends on, including previous stages inputs.
+        :param stage:
+        :return:
+        """
+        key = []
+        for name, (attributes, settings) in self.stage_dependencies.items():
+            key.extend(getattr(self, attribute) for attribute in attributes)
+            key.extend(self.settings[setting] for setting in settings)
+            if name == stage:
+                return tuple(key)
+        raise ValueError(f"Invalid value for stage: {stage}. Allowed values are: {list(self.stage_dependencies)}")
+
+    def run_stage(self, stage, compute):
+        """
+        Return the stored result of a stage, calling compute only if one of its inputs changed.
+        :param stage:
+        :param compute:
+        :return:
+        """
+        key = self.stage_key(stage)
+        if stage not in self._stages or self._stages[stage][0] != key:
+            self._stages[stage] = (key, compute())
         else:
-            times['midnight'] = times['sunset'] + self.time_diff(times['sunset'], times['sunrise']) / 2
+            self.stage_hits[stage] += 1
+        return self._stages[stage][1]
+
+    @property
+    def adjusted_times(self):
+        """
+        Last computed adjusted times (float hours), before tuning and formatting.
+        :return:
+        """
+        if 'adjusted' not in self._stages:
+            return None
+        return dict(self._stages['adjusted'][1])
+
+    def render_times(self, times=None):
+        """
+        Apply the current tune offsets and time format to adjusted times,
+        without recomputing them.
+        :param times: adjusted times (see adjusted_times), default to the last computed ones,
+            which then become the last calculated times
+        :return:
+        """
+        if times is not None:
+            return self.modify_formats(self.tune_times(dict(times)))
+
+        times = self.adjusted_times
+        if times is None:
+            raise ValueError("Prayer times have not been calculated yet. Call get_times() first.")
+        self._last_calculated_times = self.modify_formats(self.tune_times(times))
+        return self._last_calculated_times
 
-        times = self.tune_times(times)
-        return self.modify_formats(times)
+    @staticmethod
+    def grid_axis(start, stop, resolution):
+        """
+        Return the coordinates from start to stop (inclusive) spaced by resolution degrees.
+        :param start:
+        :param stop:
+        :param resolution:
+        :return:
+        """
+        if resolution <= 0:
+            raise ValueError(f"Invalid value for resolution: {resolution}. Must be positive")
+        count = int(math.floor(abs(stop - start) / resolution + 1e-9)) + 1
+        step = resolution if stop >= start else -resolution
+        return [start + i * step for i in range(count)]
+
+    def iter_grid(self, lat_range, lng_range, resolution, date, utc_offset=0, elevation=0):
+        """
+        Lazily compute prayer times over a latitude / longitude grid, one latitude row at a time.
+        Settings are parsed once per sweep, sun positions (and their declination sine / cosine and noon)
+        once per longitude column, latitude sine / cosine once per row: each point only evaluates the
+        hour angles (arccos) and the adjustments, in the same order as compute_times.
+        Times are float hours (NaN when the time does not exist), tuned but not formatted.
+        :param lat_range: (first latitude, last latitude)
+        :param lng_range: (first longitude, last longitude)
+        :param resolution: grid step in degrees
+        :param date:
+        :param utc_offset:
+        :param elevation:
+        :return: generator of (row index, {name: row values})
+        """
+        lats = self.grid_axis(lat_range[0], lat_range[1], resolution)
+        lngs = self.grid_axis(lng_range[0], lng_range[1], resolution)
+        julian_date = self.julian(date.year, date.month, date.day)
+        day_times = self.day_portion(dict(self.initial_times))
+
+        # settings, parsed once per sweep
+        minutes = self.minute_adjustments()
+        portions = self.high_lats_portions() if self.settings['highLats'] != 'None' else []
+        # times given in minutes are derived from other times, their angle time is not needed
+        derived = {name for name, base, _ in minutes if name != base}
+        angle_times = [(name, self.sin(angle), name in ('imsak', 'fajr', 'sunrise'))
+                       for name, angle in self.sun_angles(elevation).items() if name not in derived]
+        asr_factor = self.asr_factor(self.settings['asr'])
+        offsets = [(name, self.offset[name] / 60.0) for name in self.time_names]
+
+        # sun positions (declination sine / cosine, noon), once per column
+        columns = []
+        for lng in lngs:
+            positions = self.sun_positions(day_times, julian_date - lng / (15 * 24.0))
+            suns = {name: (self.sin(decl), self.cos(decl), self.fixhour(12 - eqt))
+                    for name, (decl, eqt) in positions.items()}
+            columns.append((suns, positions['asr'][0], utc_offset - lng / 15.0))
+
+        for i, lat in enumerate(lats):
+            sin_lat = self.sin(lat)
+            cos_lat = self.cos(lat)
+            row = {name: [] for name in self.time_names}
+            for suns, asr_decl, tz_adjust in columns:
+                times = {name: self.hour_angle_time(sin_angle, *suns[name], sin_lat, cos_lat, ccw)
+                         for name, sin_angle, ccw in angle_times}
+                times['asr'] = self.hour_angle_time(self.sin(self.asr_angle(asr_factor, lat, asr_decl)),
+                                                    *suns['asr'], sin_lat, cos_lat)
+                times['dhuhr'] = suns['dhuhr'][2]
+
+                # same steps as adjust_times and adjust_day_times
+                for name in times:
+                    times[name] += tz_adjust
+                if portions:
+                    self.adjust_high_lats(times, portions)
+                self.adjust_minutes(times, minutes)
+                times['midnight'] = self.midnight_time(times)
+
+                for name, offset in offsets:
+                    row[name].append(times[name] + offset)
+            yield i, row
+
+    def sweep_grid(self, lat_range, lng_range, resolution, date, utc_offset=0, elevation=0, out=None):
+        """
+        Compute prayer times over a latitude / longitude grid (see iter_grid).
+        :param lat_range: (first latitude, last latitude)
+        :param lng_range: (first longitude, last longitude)
+        :param resolution: grid step in degrees
+        :param date:
+        :param utc_offset:
+        :param elevation:
+        :param out: optional mapping of 2-D arrays (rows = latitudes, columns = longitudes) to write into,
+            e.g. numpy.memmap arrays; only the times present in out are written, row by row
+        :return: out, or {name: list of rows} if out is not given
+        """
+        if out is None:
+            out = {name: [] for name in self.time_names}
+            for _, row in self.iter_grid(lat_range, lng_range, resolution, date, utc_offset, elevation):
+                for name, values in row.items():
+                    out[name].append(values)
+            return out
+
+        for i, row in self.iter_grid(lat_range, lng_range, resolution, date, utc_offset, elevation):
+            for name in out:
+                out[name][i] = row[name]
+        return out
 
     def adjust_times(self, times):
         """
@@ -461,17 +739,32 @@ class PrayTimes(object):
         if params['highLats'] != 'None':
             times = dict(self.adjust_high_lats(times))
 
-        if self.is_min(params['imsak']):
-            times['imsak'] = times['fajr'] + self.eval(params['imsak']) / 60.0
-        # need to ask about 'min' settings
-        if self.is_min(params['maghrib']):
-            times['maghrib'] = times['sunset'] + self.eval(params['maghrib']) / 60.0
-
-        if self.is_min(params['isha']):
-            times['isha'] = times['maghrib'] + self.eval(params['isha']) / 60.0
+        return self.adjust_minutes(times)
 
-        times['dhuhr'] += self.eval(params['dhuhr']) / 60.0
+    def minute_adjustments(self):
+        """
+        Return the (name, base, hours) of the times set to their base time plus some minutes,
+        in application order: imsak, maghrib and isha given in minutes, then dhuhr.
+        :return:
+        """
+        params = self.settings
+        adjustments = []
+        # need to ask about 'min' settings
+        for name, base in (('imsak', 'fajr'), ('maghrib', 'sunset'), ('isha', 'maghrib')):
+            if self.is_min(params[name]):
+                adjustments.append((name, base, self.eval(params[name]) / 60.0))
+        adjustments.append(('dhuhr', 'dhuhr', self.eval(params['dhuhr']) / 60.0))
+        return adjustments
 
+    def adjust_minutes(self, times, adjustments=None):
+        """
+        Apply minute adjustments (see minute_adjustments).
+        :param times:
+        :param adjustments: default to the current settings ones
+        :return:
+        """
+        for name, base, hours in self.minute_adjustments() if adjustments is None else adjustments:
+            times[name] = times[base] + hours
         return times
 
     def asr_factor(self, asr_param):
@@ -513,21 +806,30 @@ class PrayTimes(object):
             times[name] = self.get_formatted_time(times[name], self.time_format)
         return times
 
-    def adjust_high_lats(self, times):
+    def high_lats_portions(self):
+        """
+        Return the (name, base, night portion factor, ccw) of the times adjusted for higher latitudes.
+        Times given in minutes are skipped, they are derived from other times afterwards.
+        :return:
+        """
+        params = self.settings
+        portions = []
+        for name, base, ccw in (('imsak', 'sunrise', True), ('fajr', 'sunrise', True),
+                                ('isha', 'sunset', False), ('maghrib', 'sunset', False)):
+            if not self.is_min(params[name]):
+                portions.append((name, base, self.night_portion(self.eval(params[name]), 1), ccw))
+        return portions
+
+    def adjust_high_lats(self, times, portions=None):
         """
         Adjust times for locations in higher latitudes.
         :param times:
+        :param portions: default to the current settings ones (see high_lats_portions)
         :return:
         """
-        params = self.settings
         night_time = self.time_diff(times['sunset'], times['sunrise'])  # sunset to sunrise
-        times['imsak'] = self.adjust_hl_time(times['imsak'], times['sunrise'], self.eval(params['imsak']), night_time,
-                                             'ccw')
-        times['fajr'] = self.adjust_hl_time(times['fajr'], times['sunrise'], self.eval(params['fajr']), night_time,
-                                            'ccw')
-        times['isha'] = self.adjust_hl_time(times['isha'], times['sunset'], self.eval(params['isha']), night_time)
-        times['maghrib'] = self.adjust_hl_time(times['maghrib'], times['sunset'], self.eval(params['maghrib']),
-                                               night_time)
+        for name, base, portion, ccw in self.high_lats_portions() if portions is None else portions:
+            times[name] = self.adjust_portion_time(times[name], times[base], portion * night_time, ccw)
         return times
 
     def adjust_hl_time(self, time_, base, angle, night, direction=None):
@@ -540,10 +842,23 @@ class PrayTimes(object):
         :param direction:
         :return:
         """
-        portion = self.night_portion(angle, night)
-        diff = self.time_diff(time_, base) if direction == 'ccw' else self.time_diff(base, time_)
-        if math.isnan(time_) or diff > portion:
-            time_ = base + (-portion if direction == 'ccw' else portion)
+        return self.adjust_portion_time(time_, base, self.night_portion(angle, night), direction == 'ccw')
+
+    def adjust_portion_time(self, time_, base, portion, ccw=False):
+        """
+        Limit a time to the given night portion from its base time.
+        :param time_:
+        :param base:
+        :param portion: night portion (hours)
+        :param ccw:
+        :return:
+        """
+        if math.isnan(time_):
+            # sun never reaches the angle: the fallback always applies
+            return base + (-portion if ccw else portion)
+        diff = self.time_diff(time_, base) if ccw else self.time_diff(base, time_)
+        if diff > portion:
+            time_ = base + (-portion if ccw else portion)
         return time_
 
     def night_portion(self, angle, night):
@@ -645,6 +960,22 @@ class PrayTimes(object):
         a -= mode * (math.floor(a / mode))
         return a + mode if a < 0 else a
 
+    @staticmethod
+    def percentile(values, pct):
+        """
+        Return the given percentile (0-100) of values using linear interpolation.
+        :param values:
+        :param pct:
+        :return:
+        """
+        if not values:
+            return float('nan')
+        values = sorted(values)
+        rank = (len(values) - 1) * pct / 100.0
+        low = math.floor(rank)
+        high = min(low + 1, len(values) - 1)
+        return values[low] + (values[high] - values[low]) * (rank - low)
+
     def __str__(self) -> str:
         """
         Return formatted string representation of the last calculated prayer times.
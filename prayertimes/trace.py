@@ -0,0 +1,427 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+"""
+Trace recording, generation and replay for capacity planning.
+
+A trace is a JSON lines file, one successful get_times call per line:
+{"d": [2024, 3, 1], "c": [48.86, 2.35], "m": "UOIF", "u": 1}
+or, for timezone calls, the aware ISO datetime (the UTC offset depends on it):
+{"d": "2024-03-31T23:00:00+00:00", "c": [48.86, 2.35], "m": "UOIF", "z": "Europe/Paris"}
+with optional keys "s" (settings differing from the method ones),
+"o" (non-zero tune offsets) and "f" (time format, if not 24h).
+
+* Record the calls of a calculator
+>> with TraceRecorder('trace.jsonl') as recorder:
+>>     pt = PrayTimes(method='ISNA', get_times_hook=recorder)
+>>     ...
+
+* Generate a synthetic trace (Zipf distributed cities, dates around a day)
+>> python -m prayertimes.trace generate trace.jsonl --count 100000
+
+* Replay it flat-out, or at a target rate (calls per second)
+>> python -m prayertimes.trace replay trace.jsonl --config cached --rate 2000
+
+| Config  | Description                                              | Cache hits                |
+|---------|----------------------------------------------------------|---------------------------|
+| plain   | New PrayTimes calculator for each call                   | none                      |
+| shared  | One calculator per configuration, reused (stage caches)  | sun positions stage reuse |
+| cached  | LRU cache of results in front of shared calculators      | LRU cache hits            |
+| batch   | AsyncPrayTimes micro-batching on the default thread pool | deduplicated calls        |
+| process | AsyncPrayTimes micro-batching on a process pool          | deduplicated calls        |
+
+Max RSS is reported in kB, plus the largest pool worker for the process config.
+"""
+
+import argparse
+import asyncio
+import collections
+import datetime
+import json
+import math
+import random
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+
+from prayertimes.async_prayertimes import AsyncPrayTimes
+from prayertimes.prayertimes import PrayTimes
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+# Synthetic trace cities, most popular first: (coords, utc_offset, method)
+CITIES = [
+    ((-6.2088, 106.8456), 7, 'Singapore'),
+    ((30.0444, 31.2357), 2, 'Egypt'),
+    ((24.8607, 67.0011), 5, 'Karachi'),
+    ((41.0082, 28.9784), 3, 'Turkey'),
+    ((23.8103, 90.4125), 6, 'Karachi'),
+    ((21.3891, 39.8579), 3, 'Makkah'),
+    ((35.6892, 51.3890), 3.5, 'Tehran'),
+    ((33.5731, -7.5898), 1, 'MWL'),
+    ((48.8566, 2.3522), 1, 'UOIF'),
+    ((51.5074, -0.1278), 0, 'MWL'),
+    ((40.7128, -74.0060), -5, 'ISNA'),
+    ((3.1390, 101.6869), 8, 'Singapore'),
+    ((36.7538, 3.0588), 1, 'MWL'),
+    ((33.3152, 44.3661), 3, 'Jafari'),
+    ((25.2048, 55.2708), 4, 'Makkah'),
+    ((52.5200, 13.4050), 1, 'MWL'),
+    ((43.6532, -79.3832), -5, 'ISNA'),
+    ((59.3293, 18.0686), 1, 'MWL'),
+    ((-33.8688, 151.2093), 10, 'MWL'),
+    ((60.1699, 24.9384), 2, 'MWL'),
+]
+
+CONFIGS = ['plain', 'shared', 'cached', 'batch', 'process']
+
+
+def trace_entry(pt, date, coords, kwargs):
+    """
+    Build the compact trace entry of a get_times call.
+    :param pt: calculator
+    :param date:
+    :param coords:
+    :param kwargs: get_times keyword arguments
+    :return:
+    """
+    if 'utc_offset' in kwargs:
+        entry = {'d': [date.year, date.month, date.day], 'c': list(coords), 'm': pt.method, 'u': kwargs['utc_offset']}
+    else:
+        # naive datetimes are read in the local timezone by get_times, store them as aware ones,
+        # aware ones are kept as given (converting them may change their date)
+        date = date if date.tzinfo is not None else date.astimezone()
+        entry = {'d': date.isoformat(), 'c': list(coords), 'm': pt.method, 'z': kwargs['timezone']}
+
+    defaults = {**PrayTimes.settings, **PrayTimes.methods[pt.method]['params']}
+    settings = {name: value for name, value in pt.settings.items() if defaults.get(name) != value}
+    if settings:
+        entry['s'] = settings
+    offset = {name: value for name, value in pt.offset.items() if value}
+    if offset:
+        entry['o'] = offset
+    if pt.time_format != '24h':
+        entry['f'] = pt.time_format
+    return entry
+
+
+def entry_call(entry):
+    """
+    Return the get_times call of a trace entry.
+    :param entry:
+    :return: (date, coords, kwargs, method, settings, offset, time_format)
+    """
+    if 'z' in entry:
+        date = datetime.datetime.fromisoformat(entry['d'])
+        kwargs = {'timezone': entry['z']}
+    else:
+        date = datetime.date(*entry['d'])
+        kwargs = {'utc_offset': entry['u']}
+    return (date, tuple(entry['c']), kwargs, entry['m'], entry.get('s', {}), entry.get('o', {}),
+            entry.get('f', '24h'))
+
+
+class TraceRecorder(object):
+    """
+    get_times hook writing every successful call to a trace file (see PrayTimes get_times_hook).
+    """
+
+    def __init__(self, path):
+        self.file = open(path, 'a')
+        self.count = 0
+
+    def __call__(self, pt, date, coords, kwargs):
+        self.file.write(json.dumps(trace_entry(pt, date, coords, kwargs), separators=(',', ':')) + '\n')
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def write_trace(path, entries):
+    """
+    Write trace entries to a file.
+    :param path:
+    :param entries:
+    :return:
+    """
+    with open(path, 'w') as f:
+        for entry in entries:
+            f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+
+
+def load_trace(path):
+    """
+    Read trace entries from a file.
+    :param path:
+    :return:
+    """
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def generate_trace(count, city_count=None, zipf_s=1.1, date=None, date_spread=2.0, seed=0):
+    """
+    Generate a synthetic trace.
+    City popularity follows a Zipf law, dates are mostly the given day with
+    exponentially decreasing requests for the days around it.
+    :param count: number of calls
+    :param city_count: number of distinct cities (random cities are added beyond the CITIES list)
+    :param zipf_s: Zipf exponent
+    :param date: central date, default to today
+    :param date_spread: mean distance in days from the central date
+    :param seed:
+    :return: list of trace entries
+    """
+    rng = random.Random(seed)
+    date = date or datetime.date.today()
+    city_count = city_count or len(CITIES)
+
+    cities = list(CITIES[:city_count])
+    while len(cities) < city_count:
+        lat = round(rng.uniform(-55, 65), 4)
+        lng = round(rng.uniform(-180, 180), 4)
+        cities.append(((lat, lng), round(lng / 15.0), rng.choice(list(PrayTimes.methods))))
+
+    weights = [1 / (rank + 1) ** zipf_s for rank in range(len(cities))]
+    entries = []
+    for coords, utc_offset, method in rng.choices(cities, weights, k=count):
+        days = int(rng.expovariate(1 / date_spread)) if date_spread > 0 else 0
+        day = date + datetime.timedelta(days=rng.choice([-days, days]))
+        entries.append({'d': [day.year, day.month, day.day], 'c': list(coords), 'm': method, 'u': utc_offset})
+    return entries
+
+
+def max_rss(children=False):
+    """
+    Return the max resident set size in kB of this process, or of its largest
+    terminated child process, None if unavailable.
+    :param children:
+    :return:
+    """
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kB elsewhere
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+class ReplayReport(object):
+    """
+    Result of a trace replay.
+    """
+
+    def __init__(self, config, latencies, elapsed, cache_hits=0, cache_lookups=0, children=False):
+        self.config = config
+        self.latencies = latencies
+        self.elapsed = elapsed
+        self.cache_hits = cache_hits
+        self.cache_lookups = cache_lookups
+        self.max_rss = max_rss()
+        self.max_children_rss = max_rss(children=True) if children else None
+
+    @property
+    def throughput(self):
+        return len(self.latencies) / self.elapsed if self.elapsed > 0 else float('inf')
+
+    @property
+    def cache_hit_ratio(self):
+        return self.cache_hits / self.cache_lookups if self.cache_lookups else float('nan')
+
+    def percentile(self, pct):
+        return PrayTimes.percentile(self.latencies, pct)
+
+    def __str__(self) -> str:
+        lines = [
+            f"Config     : {self.config}",
+            f"Calls      : {len(self.latencies)}",
+            f"Throughput : {self.throughput:.1f} calls/s",
+            f"Latency p50 / p90 / p99 / max : {self.percentile(50) * 1000:.3f} / {self.percentile(90) * 1000:.3f} / "
+            f"{self.percentile(99) * 1000:.3f} / {max(self.latencies, default=0) * 1000:.3f} ms",
+            f"Cache hits : {self.cache_hit_ratio:.1%} ({self.cache_hits}/{self.cache_lookups})"
+            if self.cache_lookups else "Cache hits : n/a",
+            f"Max RSS    : {self.max_rss} kB" if self.max_rss is not None else "Max RSS    : unavailable",
+        ]
+        if self.max_children_rss is not None:
+            lines.append(f"Max worker RSS : {self.max_children_rss} kB")
+        return '\n'.join(lines)
+
+
+def calculator(method, settings, offset, time_format):
+    """
+    Build a calculator for a configuration.
+    """
+    pt = PrayTimes(method=method, time_format=time_format)
+    pt.adjust(settings)
+    pt.tune(offset)
+    return pt
+
+
+def call_keys(call):
+    """
+    Return the (request, configuration) cache keys of a call.
+    :param call: entry_call result
+    :return:
+    """
+    date, coords, kwargs, method, settings, offset, time_format = call
+    config_key = (method, json.dumps(settings, sort_keys=True), json.dumps(offset, sort_keys=True), time_format)
+    return (date, coords, tuple(sorted(kwargs.items()))) + config_key, config_key
+
+
+def replay_sync(calls, config, rate=None, cache_size=10000):
+    """
+    Replay calls one after the other in the current thread.
+    :param calls: list of entry_call results
+    :param config: plain, shared or cached
+    :param rate: target calls per second, flat-out if None
+    :param cache_size: maximum number of results kept by the cached config
+    :return: ReplayReport
+    """
+    calculators = {}
+    cache = collections.OrderedDict()
+    hits = 0
+    latencies = []
+    keys = [call_keys(call) for call in calls]
+
+    start = time.perf_counter()
+    for i, (date, coords, kwargs, method, settings, offset, time_format) in enumerate(calls):
+        scheduled = start + i / rate if rate else time.perf_counter()
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+        if config == 'plain':
+            calculator(method, settings, offset, time_format).get_times(date, coords, **kwargs)
+        else:
+            key, config_key = keys[i]
+            if config == 'cached' and key in cache:
+                cache.move_to_end(key)
+                hits += 1
+            else:
+                if config_key not in calculators:
+                    calculators[config_key] = calculator(method, settings, offset, time_format)
+                times = calculators[config_key].get_times(date, coords, **kwargs)
+                if config == 'cached':
+                    cache[key] = times
+                    if len(cache) > cache_size:
+                        cache.popitem(last=False)
+        # latency from the scheduled time, so that queueing delays are counted
+        latencies.append(time.perf_counter() - scheduled)
+    elapsed = time.perf_counter() - start
+
+    if config == 'shared':
+        hits = sum(pt.stage_hits['positions'] for pt in calculators.values())
+    lookups = len(calls) if config in ('shared', 'cached') else 0
+    return ReplayReport(config, latencies, elapsed, hits, lookups)
+
+
+async def replay_async(calls, config, rate=None, window=0.002, max_batch=64):
+    """
+    Replay calls concurrently through AsyncPrayTimes.
+    Deduplicated calls are reported as cache hits.
+    :param calls: list of entry_call results
+    :param config: batch or process
+    :param rate: target calls per second, flat-out if None
+    :param window: batching window (seconds)
+    :param max_batch:
+    :return: ReplayReport
+    """
+    executor = ProcessPoolExecutor() if config == 'process' else None
+    facades = {}
+    latencies = []
+
+    async def run(call, config_key, scheduled):
+        date, coords, kwargs, method, settings, offset, time_format = call
+        if config_key not in facades:
+            facade = AsyncPrayTimes(window=window, max_batch=max_batch, executor=executor,
+                                    method=method, time_format=time_format)
+            facade.adjust(settings)
+            facade.tune(offset)
+            facades[config_key] = facade
+        await facades[config_key].get_times(date, coords, **kwargs)
+        latencies.append(time.perf_counter() - scheduled)
+
+    try:
+        config_keys = [call_keys(call)[1] for call in calls]
+        start = time.perf_counter()
+        tasks = []
+        for i, call in enumerate(calls):
+            scheduled = start + i / rate if rate else time.perf_counter()
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.ensure_future(run(call, config_keys[i], scheduled)))
+            if not rate and len(tasks) % max_batch == 0:
+                # let the event loop dispatch batches while flooding
+                await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    hits = sum(facade.deduplicated for facade in facades.values())
+    return ReplayReport(config, latencies, elapsed, hits, len(calls), children=config == 'process')
+
+
+def replay(entries, config='plain', rate=None, **kwargs):
+    """
+    Replay trace entries against a configuration (see CONFIGS).
+    :param entries: trace entries
+    :param config:
+    :param rate: target calls per second, flat-out if None
+    :param kwargs: replay_sync or replay_async options
+    :return: ReplayReport
+    """
+    if config not in CONFIGS:
+        raise ValueError(f"Invalid value for config: {config}. Allowed values are: {CONFIGS}")
+    calls = [entry_call(entry) for entry in entries]
+    if config in ('batch', 'process'):
+        return asyncio.run(replay_async(calls, config, rate, **kwargs))
+    return replay_sync(calls, config, rate, **kwargs)
+
+
+def main():
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description="Prayer times trace generation and replay")
+    subparsers = parser.add_subparsers(dest='action', required=True)
+
+    generate = subparsers.add_parser('generate', help="generate a synthetic trace")
+    generate.add_argument('path')
+    generate.add_argument('--count', type=int, default=10000)
+    generate.add_argument('--cities', type=int, default=None, help="number of distinct cities")
+    generate.add_argument('--zipf', type=float, default=1.1, help="Zipf exponent of the cities popularity")
+    generate.add_argument('--date-spread', type=float, default=2.0, help="mean distance in days from today")
+    generate.add_argument('--seed', type=int, default=0)
+
+    play = subparsers.add_parser('replay', help="replay a trace")
+    play.add_argument('path')
+    play.add_argument('--config', choices=CONFIGS, default='plain')
+    play.add_argument('--rate', type=float, default=None, help="target calls per second (default: flat-out)")
+
+    args = parser.parse_args()
+    if args.action == 'generate':
+        entries = generate_trace(args.count, args.cities, args.zipf, date_spread=args.date_spread, seed=args.seed)
+        write_trace(args.path, entries)
+        print(f"{len(entries)} calls written to {args.path}")
+    else:
+        if args.rate is not None and (args.rate <= 0 or math.isinf(args.rate)):
+            parser.error("--rate must be a positive number")
+        print(replay(load_trace(args.path), args.config, args.rate))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+import os
+import unittest
+
+from prayertimes.accuracy import evaluate, load_golden, make_cases, minute_error, reference_engine
+from prayertimes.prayertimes import PrayTimes
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), 'data', 'golden_times.jsonl')
+
+
+class TestAccuracy(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cases = load_golden(GOLDEN_PATH)
+
+    def test_golden_covers_cases(self):
+        self.assertEqual(len(self.cases), len(make_cases()))
+        self.assertEqual({c['adjust'].get('highLats') for c in self.cases},
+                         {None, 'None', 'NightMiddle', 'OneSeventh', 'AngleBased'})
+        self.assertTrue(any(v == '-----' for c in self.cases for v in c['times'].values()))
+
+    def test_reference_engine(self):
+        report = evaluate(reference_engine, self.cases)
+        self.assertEqual(report.mismatches, [])
+        self.assertEqual(report.max_error, 0.0)
+        self.assertEqual(report.cases, len(self.cases))
+
+    def test_shifted_engine(self):
+        def engine(case):
+            times = reference_engine(case)
+            return {k: v if v == '-----' else v + 1 / 60.0 for k, v in times.items()}
+
+        report = evaluate(engine, self.cases)
+        self.assertAlmostEqual(report.max_error, 1.0)
+        self.assertAlmostEqual(report.percentile(50), 1.0)
+
+    def test_batch_engine(self):
+        report = evaluate(lambda cases: [reference_engine(c) for c in cases], self.cases[:20], batch=True)
+        self.assertEqual(report.max_error, 0.0)
+
+    def test_minute_error(self):
+        self.assertAlmostEqual(minute_error(23.99, 0.01), 1.2)
+        self.assertEqual(minute_error('-----', '-----'), 0.0)
+        self.assertIsNone(minute_error('-----', 5.0))
+        self.assertEqual(PrayTimes.percentile([1, 2, 3, 4, 5], 50), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
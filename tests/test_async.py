@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+import asyncio
+import datetime
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from prayertimes.async_prayertimes import AsyncPrayTimes
+from prayertimes.prayertimes import PrayTimes
+
+
+class TestAsyncPrayTimes(unittest.IsolatedAsyncioTestCase):
+
+    DATE = datetime.date(2024, 3, 1)
+
+    def expected(self, coords, method='ISNA', **settings):
+        pt = PrayTimes(method=method)
+        pt.adjust(settings)
+        return pt.get_times(self.DATE, coords, utc_offset=1)
+
+    async def test_batching(self):
+        apt = AsyncPrayTimes(method='ISNA', window=0.05, max_batch=100)
+        coords = [(48.66 + i % 5, 2.33) for i in range(20)]
+        results = await asyncio.gather(*(apt.get_times(self.DATE, c, utc_offset=1) for c in coords))
+
+        for c, times in zip(coords, results):
+            self.assertEqual(times, self.expected(c))
+
+        stats = apt.stats()
+        self.assertEqual(stats['queue_depth'], 0)
+        self.assertEqual(stats['requests'], 20)
+        self.assertEqual(stats['deduplicated'], 15)
+        self.assertEqual(stats['batch_sizes'], {20: 1})
+        self.assertEqual(stats['unique_sizes'], {5: 1})
+
+    async def test_max_batch(self):
+        apt = AsyncPrayTimes(window=10, max_batch=4)
+        await asyncio.wait_for(asyncio.gather(*(apt.get_times(self.DATE, (30 + i, 0), utc_offset=1)
+                                                for i in range(8))), timeout=5)
+        self.assertEqual(apt.stats()['batch_sizes'], {4: 2})
+
+    async def test_settings_captured(self):
+        apt = AsyncPrayTimes(method='ISNA', window=0.05)
+        standard = apt.get_times(self.DATE, (48.66, 2.33), utc_offset=1)
+        apt.adjust({'asr': 'Hanafi'})
+        hanafi = apt.get_times(self.DATE, (48.66, 2.33), utc_offset=1)
+        standard, hanafi = await asyncio.gather(standard, hanafi)
+
+        self.assertEqual(standard, self.expected((48.66, 2.33)))
+        self.assertEqual(hanafi, self.expected((48.66, 2.33), asr='Hanafi'))
+
+    async def test_error(self):
+        apt = AsyncPrayTimes(window=0.01)
+        valid = apt.get_times(self.DATE, (48.66, 2.33), utc_offset=1)
+        invalid = apt.get_times(self.DATE, (48.66, 2.33))
+        results = await asyncio.gather(valid, invalid, return_exceptions=True)
+        self.assertTrue(isinstance(results[0], dict))
+        self.assertTrue(isinstance(results[1], TypeError))
+
+    async def test_dispatch_error(self):
+        executor = ThreadPoolExecutor()
+        executor.shutdown()
+
+        # dispatched by the window
+        apt = AsyncPrayTimes(window=0.01, executor=executor)
+        with self.assertRaises(RuntimeError):
+            await asyncio.wait_for(apt.get_times(self.DATE, (48.66, 2.33), utc_offset=1), timeout=5)
+
+        # dispatched by max_batch: every queued call fails
+        apt = AsyncPrayTimes(window=10, max_batch=3, executor=executor)
+        calls = [apt.get_times(self.DATE, (48.66 + i, 2.33), utc_offset=1) for i in range(3)]
+        results = await asyncio.wait_for(asyncio.gather(*calls, return_exceptions=True), timeout=5)
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+
+        # unhashable setting
+        apt = AsyncPrayTimes(window=0.01)
+        apt.adjust({'fajr': [18]})
+        with self.assertRaises(TypeError):
+            await asyncio.wait_for(apt.get_times(self.DATE, (48.66, 2.33), utc_offset=1), timeout=5)
+
+    async def test_latency(self):
+        apt = AsyncPrayTimes(window=0.01)
+        await asyncio.gather(*(apt.get_times(self.DATE, (30 + i, 0), utc_offset=1) for i in range(10)))
+        stats = apt.stats()
+        self.assertGreaterEqual(stats['added_latency']['max'], stats['queue_latency']['max'])
+        self.assertGreater(stats['added_latency']['p50'], stats['queue_latency']['p50'])
+
+    async def test_process_pool(self):
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            apt = AsyncPrayTimes(method='MWL', executor=executor)
+            times = await apt.get_times(self.DATE, (21.39, 39.86), utc_offset=1)
+        self.assertEqual(times, self.expected((21.39, 39.86), method='MWL'))
+
+
+if __name__ == '__main__':
+    unittest.main()
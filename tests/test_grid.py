@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+import datetime
+import math
+import unittest
+
+from prayertimes.prayertimes import PrayTimes
+
+
+class TestGrid(unittest.TestCase):
+
+    DATE = datetime.date(2024, 6, 21)
+
+    def setUp(self):
+        self.pt = PrayTimes(method="MWL", time_format="Float")
+        self.pt.tune({'maghrib': 3})
+
+    def assertSameTime(self, expected, actual):
+        if expected == '-----':
+            self.assertTrue(math.isnan(actual))
+        else:
+            self.assertEqual(expected, actual)
+
+    def test_grid_axis(self):
+        self.assertEqual(PrayTimes.grid_axis(0, 1, 0.5), [0, 0.5, 1])
+        self.assertEqual(PrayTimes.grid_axis(10, 0, 5), [10, 5, 0])
+        self.assertEqual(len(PrayTimes.grid_axis(30, 31, 0.1)), 11)
+        with self.assertRaises(ValueError):
+            PrayTimes.grid_axis(0, 1, 0)
+
+    def test_matches_scalar(self):
+        lats = PrayTimes.grid_axis(-60, 80, 20)
+        lngs = PrayTimes.grid_axis(-20, 20, 20)
+        for method in ['MWL', 'Makkah', 'Jafari']:
+            for high_lats in ['None', 'NightMiddle', 'OneSeventh', 'AngleBased']:
+                for asr in ['Standard', 'Hanafi']:
+                    pt = PrayTimes(method=method, time_format="Float")
+                    pt.adjust({'highLats': high_lats, 'asr': asr, 'dhuhr': '2 min'})
+                    pt.tune({'maghrib': 3, 'midnight': -1})
+                    grid = pt.sweep_grid((-60, 80), (-20, 20), 20, self.DATE, utc_offset=2, elevation=300)
+                    self.assertEqual(len(grid['maghrib']), len(lats))
+                    self.assertEqual(len(grid['maghrib'][0]), len(lngs))
+
+                    for i, lat in enumerate(lats):
+                        for j, lng in enumerate(lngs):
+                            times = pt.get_times(self.DATE, (lat, lng, 300), utc_offset=2)
+                            for name in PrayTimes.time_names:
+                                self.assertSameTime(times[name], grid[name][i][j])
+
+    def test_out(self):
+        out = {'maghrib': [[None] * 3 for _ in range(2)]}
+        self.pt.get_times(self.DATE, (21.39, 39.86), utc_offset=3)
+        result = self.pt.sweep_grid((30, 31), (0, 2), 1, self.DATE, out=out)
+        self.assertIs(result, out)
+        self.assertEqual(list(out), ['maghrib'])
+        self.assertTrue(all(isinstance(v, float) for row in out['maghrib'] for v in row))
+
+        # the calculator location is kept
+        self.assertEqual((self.pt.lat, self.pt.lng), (21.39, 39.86))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,7 @@
 # -*- coding: UTF-8 -*-
 
 import datetime
+import math
 import unittest
 
 from prayertimes.prayertimes import PrayTimes
@@ -41,6 +42,24 @@ class TestPT(unittest.TestCase):
 
         self.test_instance_pt()
 
+    def test_high_latitudes(self):
+        pt = PrayTimes(method="MWL", time_format="Float")
+        pt.get_times(date=datetime.date(2023, 12, 21), coords=(78.22, 15.63), utc_offset=1)
+        self.assertTrue(math.isnan(pt.sun_angle_time(0.833, 6 / 24.0, 'ccw')))
+
+        # (imsak, fajr, isha) computed before the high latitudes fast path, must stay identical
+        expected = {
+            'None': ('-----', '-----', '-----'),
+            'NightMiddle': (1.6589390006456688, 1.492272333979002, 25.492272333979002),
+            'OneSeventh': (2.677454799077291, 2.5107881324106245, 24.473756535547377),
+            'AngleBased': (2.229307847767377, 2.0626411811007106, 24.87437274959715),
+        }
+        for high_lats, (imsak, fajr, isha) in expected.items():
+            pt.adjust({'highLats': high_lats})
+            times = pt.get_times(date=datetime.date(2023, 6, 21), coords=(64.15, -21.94), utc_offset=0)
+            self.assertEqual((times['imsak'], times['fajr'], times['isha']), (imsak, fajr, isha))
+            self.assertEqual(times['midnight'], 25.492272333979002)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+import datetime
+import unittest
+
+from prayertimes.prayertimes import PrayTimes
+
+
+class CountingPrayTimes(PrayTimes):
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = {'sun_positions': 0, 'compute_prayertimes': 0, 'adjust_day_times': 0}
+
+    def sun_positions(self, times, julian_date=None):
+        self.calls['sun_positions'] += 1
+        return super().sun_positions(times, julian_date)
+
+    def compute_prayertimes(self, times, positions=None):
+        self.calls['compute_prayertimes'] += 1
+        return super().compute_prayertimes(times, positions)
+
+    def adjust_day_times(self, times):
+        self.calls['adjust_day_times'] += 1
+        return super().adjust_day_times(times)
+
+
+class TestStages(unittest.TestCase):
+
+    DATE = datetime.date(2024, 3, 1)
+    COORDS = (48.66, 2.33)
+
+    def setUp(self):
+        self.pt = CountingPrayTimes(method="ISNA")
+        self.pt.get_times(self.DATE, self.COORDS, utc_offset=1)
+
+    def get_times(self):
+        return self.pt.get_times(self.DATE, self.COORDS, utc_offset=1)
+
+    def expected(self):
+        pt = PrayTimes(method=self.pt.method, time_format=self.pt.time_format)
+        pt.settings = dict(self.pt.settings)
+        pt.tune(self.pt.offset)
+        return pt.get_times(self.DATE, self.COORDS, utc_offset=1)
+
+    def test_tune_and_format(self):
+        self.pt.tune({'fajr': 10})
+        self.pt.time_format = '12h'
+        self.assertEqual(self.get_times(), self.expected())
+        self.assertEqual(self.pt.calls, {'sun_positions': 1, 'compute_prayertimes': 1, 'adjust_day_times': 1})
+
+    def test_asr(self):
+        self.pt.adjust({'asr': 'Hanafi'})
+        self.assertEqual(self.get_times(), self.expected())
+        self.assertEqual(self.pt.calls, {'sun_positions': 1, 'compute_prayertimes': 2, 'adjust_day_times': 2})
+
+    def test_high_lats(self):
+        self.pt.adjust({'highLats': 'AngleBased'})
+        self.assertEqual(self.get_times(), self.expected())
+        self.assertEqual(self.pt.calls, {'sun_positions': 1, 'compute_prayertimes': 1, 'adjust_day_times': 2})
+
+    def test_location(self):
+        self.pt.get_times(self.DATE, (21.39, 39.86), utc_offset=3)
+        self.assertEqual(self.pt.calls, {'sun_positions': 2, 'compute_prayertimes': 2, 'adjust_day_times': 2})
+
+    def test_render_times(self):
+        stored = self.pt.adjusted_times
+        self.pt.get_times(self.DATE, (21.39, 39.86), utc_offset=3)
+
+        last = str(self.pt)
+
+        self.pt.time_format = 'Float'
+        self.pt.tune({'isha': 5})
+        times = self.pt.render_times(stored)
+        self.assertAlmostEqual(times['isha'], stored['isha'] + 5 / 60.0)
+        self.assertEqual(self.pt.calls['sun_positions'], 2)
+
+        # times of another location do not replace the last calculated ones
+        self.assertEqual(str(self.pt), last)
+        self.assertEqual(self.pt.render_times()['isha'], self.pt.adjusted_times['isha'] + 5 / 60.0)
+        self.assertNotEqual(str(self.pt), last)
+
+        with self.assertRaises(ValueError):
+            PrayTimes().render_times()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+import collections
+import datetime
+import os
+import tempfile
+import time
+import unittest
+
+from prayertimes.prayertimes import PrayTimes
+from prayertimes.trace import TraceRecorder, entry_call, generate_trace, load_trace, replay
+
+
+class TestTrace(unittest.TestCase):
+
+    DATE = datetime.date(2024, 3, 1)
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_record(self):
+        with TraceRecorder(self.path) as recorder:
+            pt = PrayTimes(method='ISNA', time_format='Float', get_times_hook=recorder)
+            pt.adjust({'asr': 'Hanafi'})
+            pt.tune({'fajr': 5})
+            expected = [pt.get_times(self.DATE, (48.66, 2.33), utc_offset=1)]
+            with self.assertRaises(TypeError):
+                pt.get_times(self.DATE, (48.66, 2.33))
+
+            # the day after the switch to summer time in Paris, the day before in UTC
+            dst = datetime.datetime(2024, 3, 31, 23, tzinfo=datetime.timezone.utc)
+            expected.append(pt.get_times(dst, (48.66, 2.33, 35), timezone='Europe/Paris'))
+            utc_offsets = [1, pt.utc_offset]
+
+        entries = load_trace(self.path)
+        self.assertEqual(recorder.count, 2)
+        self.assertEqual(entries[0], {'d': [2024, 3, 1], 'c': [48.66, 2.33], 'm': 'ISNA', 'u': 1,
+                                      's': {'asr': 'Hanafi'}, 'o': {'fajr': 5}, 'f': 'Float'})
+        self.assertEqual(entries[1]['d'], '2024-03-31T23:00:00+00:00')
+        self.assertEqual(entries[1]['z'], 'Europe/Paris')
+        self.assertEqual(utc_offsets[1], 2)
+
+        for entry, times, utc_offset in zip(entries, expected, utc_offsets):
+            date, coords, kwargs, method, settings, offset, time_format = entry_call(entry)
+            pt = PrayTimes(method=method, time_format=time_format)
+            pt.adjust(settings)
+            pt.tune(offset)
+            self.assertEqual(pt.get_times(date, coords, **kwargs), times)
+            self.assertEqual(pt.utc_offset, utc_offset)
+
+    @unittest.skipUnless(hasattr(time, 'tzset'), 'requires time.tzset')
+    def test_record_local_timezone(self):
+        tz = os.environ.get('TZ')
+
+        def restore_tz():
+            if tz is None:
+                os.environ.pop('TZ', None)
+            else:
+                os.environ['TZ'] = tz
+            time.tzset()
+
+        self.addCleanup(restore_tz)
+        os.environ['TZ'] = 'Asia/Tokyo'
+        time.tzset()
+
+        with TraceRecorder(self.path) as recorder:
+            pt = PrayTimes(method='UOIF', get_times_hook=recorder)
+            # already April 1st in Tokyo
+            aware = datetime.datetime(2024, 3, 31, 20, tzinfo=datetime.timezone.utc)
+            naive = datetime.datetime(2024, 3, 31, 20)
+            expected = [pt.get_times(date, (48.86, 2.35), timezone='Europe/Paris') for date in (aware, naive)]
+        restore_tz()
+
+        entries = load_trace(self.path)
+        self.assertEqual([entry['d'] for entry in entries], ['2024-03-31T20:00:00+00:00', '2024-03-31T20:00:00+09:00'])
+        for entry, times in zip(entries, expected):
+            date, coords, kwargs, method, settings, offset, time_format = entry_call(entry)
+            self.assertEqual(PrayTimes(method=method).get_times(date, coords, **kwargs), times)
+
+    def test_generate(self):
+        entries = generate_trace(2000, city_count=50, date=self.DATE, seed=1)
+        self.assertEqual(entries, generate_trace(2000, city_count=50, date=self.DATE, seed=1))
+
+        cities = collections.Counter(tuple(entry['c']) for entry in entries)
+        self.assertLessEqual(len(cities), 50)
+        self.assertGreater(cities.most_common(1)[0][1], 5 * cities.most_common()[-1][1])
+
+        days = collections.Counter(tuple(entry['d']) for entry in entries)
+        self.assertEqual(days.most_common(1)[0][0], (2024, 3, 1))
+
+    def test_replay(self):
+        entries = generate_trace(200, date=self.DATE, seed=2)
+        for config in ['plain', 'shared', 'cached', 'batch']:
+            report = replay(entries, config)
+            self.assertEqual(len(report.latencies), 200)
+            self.assertGreater(report.throughput, 0)
+
+        report = replay(entries, 'shared')
+        self.assertEqual(report.cache_lookups, 200)
+        self.assertGreater(report.cache_hits, 0)
+
+        report = replay(entries, 'cached', rate=5000)
+        self.assertGreater(report.cache_hit_ratio, 0.5)
+        self.assertGreaterEqual(report.elapsed, 199 / 5000)
+
+        with self.assertRaises(ValueError):
+            replay(entries, 'invalid')
+
+
+if __name__ == '__main__':
+    unittest.main()